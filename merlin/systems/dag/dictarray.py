@@ -212,6 +212,9 @@ class DictArray:
     def __eq__(self, other):
         return self.values() == other.values() and self.dtypes() == other.dtypes()
 
+    def __contains__(self, key):
+        return key in self._columns
+
     def __setitem__(self, key, value):
         self._columns[key] = _make_column(value)
 
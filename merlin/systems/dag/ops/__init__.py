@@ -15,7 +15,7 @@
 #
 
 
-def compute_dims(col_schema, scalar_shape=None):
+def compute_dims(col_schema, scalar_shape=None, batch_dim=True):
     """
     Compute Triton dimensions for a column from its schema
 
@@ -25,14 +25,16 @@ def compute_dims(col_schema, scalar_shape=None):
         Schema of the column to compute dimensions for
     scalar_shape : List[int], optional
         The shape of a single scalar element, by default None
+    batch_dim : bool, optional
+        Whether to prepend the variable batch dimension, by default True.
+        Set to False for models configured with `max_batch_size > 0`,
+        where Triton adds the batch dimension implicitly.
 
     Returns
     -------
     List[int]
         Triton dimensions for the column
     """
-    batch_dim = [-1]
-
     default_scalar_shape = col_schema.properties.get("triton_scalar_shape", [1])
     column_dims = scalar_shape if scalar_shape is not None else default_scalar_shape
     assert isinstance(column_dims, list)
@@ -45,4 +47,4 @@ def compute_dims(col_schema, scalar_shape=None):
             else:
                 column_dims.append(-1)
 
-    return batch_dim + column_dims
+    return [-1] + column_dims if batch_dim else list(column_dims)
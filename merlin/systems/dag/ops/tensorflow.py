@@ -13,25 +13,54 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 #
+import hashlib
+import json
 import os
 import pathlib
 import tempfile
+from typing import List
 
 # this needs to be before any modules that import protobuf
-os.environ["PROTOCOL_BUFFERS_PYTHON_IMPLEMENTATION"] = "python"
+os.environ.setdefault("PROTOCOL_BUFFERS_PYTHON_IMPLEMENTATION", "python")
 
 import tensorflow as tf  # noqa
+from packaging.version import Version  # noqa
 
+from merlin.core import __version__ as merlin_core_version  # noqa
 from merlin.core.protocols import Transformable  # noqa
 from merlin.dag import ColumnSelector  # noqa
 from merlin.schema import ColumnSchema, Schema  # noqa
+from merlin.schema.io.tensorflow_metadata import TensorflowMetadata  # noqa
+from merlin.systems import __version__ as merlin_systems_version  # noqa
 from merlin.systems.dag.ops.operator import InferenceOperator  # noqa
 
 
+# `experimental_relax_shapes` was renamed to `reduce_retracing` in TensorFlow 2.9
+_RELAX_SHAPES_ARG = (
+    "reduce_retracing"
+    if Version(tf.__version__) >= Version("2.9.0")
+    else "experimental_relax_shapes"
+)
+
+
 class PredictTensorflow(InferenceOperator):
     """TensorFlow Model Prediction Operator."""
 
-    def __init__(self, model_or_path, custom_objects: dict = None, backend="tensorflow"):
+    def __init__(
+        self,
+        model_or_path,
+        custom_objects: dict = None,
+        backend="tensorflow",
+        max_batch_size: int = 0,
+        preferred_batch_sizes: List[int] = None,
+        max_queue_delay_us: int = 100,
+        instance_count: int = 1,
+        instance_kind: str = "AUTO",
+        jit_compile: bool = False,
+        pinned_memory: bool = True,
+        link_model_files: bool = False,
+        cache_schemas: bool = True,
+    ):
         """
         Instantiate a PredictTensorflow inference operator.
 
@@ -41,20 +70,85 @@ class PredictTensorflow(InferenceOperator):
             This can be a tensorflow model or a path to a tensorflow model.
         custom_objects : dict, optional
             Any custom objects that need to be loaded with the model, by default None.
+        max_batch_size : int, optional
+            Maximum batch size of the exported Triton model, by default 0.
+            Values greater than 0 enable Triton dynamic batching for the model.
+        preferred_batch_sizes : List[int], optional
+            Batch sizes the dynamic batcher should attempt to create,
+            by default half of and the full `max_batch_size`.
+        max_queue_delay_us : int, optional
+            Maximum time in microseconds a request can be delayed in the scheduling
+            queue to wait for more requests to batch with, by default 100.
+        instance_count : int, optional
+            Number of model instances Triton should run concurrently, by default 1.
+        instance_kind : str, optional
+            One of "AUTO", "GPU", "CPU". Specifies whether the model instances
+            run on the GPU or CPU, by default "AUTO".
+        jit_compile : bool, optional
+            Whether to compile the exported serving signature with XLA, by default False.
+            Not every TensorFlow op is supported by XLA, so check that the model
+            still exports before enabling this.
+        pinned_memory : bool, optional
+            Whether Triton should stage the model's inputs and outputs in pinned
+            host memory, by default True.
+        link_model_files : bool, optional
+            Whether to hard link the files of a saved model into the export
+            directory instead of copying them, by default False. Linked files
+            share storage with the original model, so only enable this when
+            neither copy will be modified in place.
+        cache_schemas : bool, optional
+            Whether to cache the schemas of a saved model under
+            `$XDG_CACHE_HOME/merlin/schemas`, by default True. Cached schemas let
+            later instances of the operator skip loading the model until it's used.
         """
         super().__init__()
 
-        if model_or_path is not None:
-            custom_objects = custom_objects or {}
+        if instance_kind.lower() not in ("auto", "cpu", "gpu"):
+            raise ValueError(
+                f"instance_kind must be one of 'AUTO', 'CPU' or 'GPU', got {instance_kind!r}"
+            )
+
+        self.max_batch_size = max_batch_size
+        self.preferred_batch_sizes = preferred_batch_sizes
+        self.max_queue_delay_us = max_queue_delay_us
+        self.instance_count = instance_count
+        self.instance_kind = instance_kind
+        self.jit_compile = jit_compile
+        self.pinned_memory = pinned_memory
+        self.link_model_files = link_model_files
+
+        self.path = None
+        self.custom_objects = custom_objects or {}
+        self._model = None
+        self._predict_fn = None
 
+        if model_or_path is not None:
             if isinstance(model_or_path, (str, os.PathLike)):
+                # The model is loaded lazily, so that schemas cached from an earlier
+                # instantiation of the same model don't require loading it at all
                 self.path = model_or_path
-                self.model = tf.keras.models.load_model(self.path, custom_objects=custom_objects)
+                schemas = _load_cached_schemas(self.path) if cache_schemas else None
+                if schemas is None:
+                    schemas = self._construct_schemas_from_model(self.model)
+                    if cache_schemas:
+                        _save_cached_schemas(self.path, schemas)
             else:
-                self.path = None
                 self.model = model_or_path
+                schemas = self._construct_schemas_from_model(self.model)
+
+            self.input_schema, self.output_schema = schemas
 
-            self.input_schema, self.output_schema = self._construct_schemas_from_model(self.model)
+    @property
+    def model(self):
+        """The TensorFlow model, loaded from `path` on first access if necessary"""
+        if self._model is None and self.path is not None:
+            self._model = tf.keras.models.load_model(self.path, custom_objects=self.custom_objects)
+        return self._model
+
+    @model.setter
+    def model(self, model):
+        self._model = model
+        self._predict_fn = None
 
     def __getstate__(self) -> dict:
         """Return state of instance when pickled.
@@ -62,9 +156,21 @@ class PredictTensorflow(InferenceOperator):
         Returns
         -------
         dict
-            Returns object state excluding model attribute.
+            Returns object state excluding the model and its traced function.
+        """
+        return {k: v for k, v in self.__dict__.items() if k not in ("_model", "_predict_fn")}
+
+    def __setstate__(self, state: dict):
+        """Restore state of instance when unpickled.
+
+        Parameters
+        ----------
+        state : dict
+            Object state, as returned by `__getstate__`
         """
-        return {k: v for k, v in self.__dict__.items() if k != "model"}
+        self.__dict__.update(state)
+        self._model = None
+        self._predict_fn = None
 
     def transform(
         self, col_selector: ColumnSelector, transformable: Transformable
@@ -88,11 +194,19 @@ class PredictTensorflow(InferenceOperator):
         input_tensors = {}
         for col in transformable.columns:
             input_tensors[col] = tf.convert_to_tensor(transformable[col].values)
-        outputs = self.model(input_tensors)
-        dict_outputs = {}
-        for col in self.output_schema.column_names:
-            dict_outputs[col] = outputs.numpy()
-        # TODO: map output schema names to outputs produced by prediction
+
+        if self._predict_fn is None:
+            # Run the model as a graph instead of op-by-op in eager mode. Relaxing
+            # shapes avoids retracing the model for every new batch size.
+            self._predict_fn = tf.function(
+                lambda inputs: self.model(inputs, training=False),
+                **{_RELAX_SHAPES_ARG: True},
+            )
+        outputs = self._name_outputs(self.model, self._predict_fn(input_tensors))
+        missing = [col for col in self.output_schema.column_names if col not in outputs]
+        if missing:
+            raise ValueError(f"Output columns {missing} not found in model outputs {list(outputs)}")
+        dict_outputs = {col: outputs[col].numpy() for col in self.output_schema.column_names}
         return type(transformable)(dict_outputs)
 
     @property
@@ -135,25 +249,32 @@ class PredictTensorflow(InferenceOperator):
         signatures = getattr(model, "signatures", {}) or {}
         default_signature = signatures.get("serving_default")
 
-        if not default_signature:
-            # roundtrip saved model to disk to generate signature if it doesn't exist
+        if default_signature:
+            input_specs = default_signature.structured_input_signature[1]
+            output_specs = default_signature.structured_outputs
+        else:
             self._ensure_input_spec_includes_names(model)
+            input_specs, output_specs = self._trace_model_specs(model)
 
+        if input_specs is None:
+            # roundtrip saved model to disk to generate signature if tracing isn't possible
             with tempfile.TemporaryDirectory() as tmp_dir:
                 tf_model_path = pathlib.Path(tmp_dir) / "model.savedmodel"
                 model.save(tf_model_path, include_optimizer=False)
                 reloaded = tf.keras.models.load_model(tf_model_path)
                 default_signature = reloaded.signatures["serving_default"]
+                input_specs = default_signature.structured_input_signature[1]
+                output_specs = default_signature.structured_outputs
 
         input_schema = Schema()
-        for col_name, col in default_signature.structured_input_signature[1].items():
+        for col_name, col in input_specs.items():
             col_schema = ColumnSchema(col_name, dtype=col.dtype.as_numpy_dtype)
             if col.shape[1] and col.shape[1] > 1:
                 col_schema = self._set_list_length(col_schema, col.shape[1])
             input_schema.column_schemas[col_name] = col_schema
 
         output_schema = Schema()
-        for col_name, col in default_signature.structured_outputs.items():
+        for col_name, col in output_specs.items():
             col_schema = ColumnSchema(col_name, dtype=col.dtype.as_numpy_dtype)
             if col.shape[1] and col.shape[1] > 1:
                 col_schema = self._set_list_length(col_schema, col.shape[1])
@@ -161,18 +282,81 @@ class PredictTensorflow(InferenceOperator):
 
         return input_schema, output_schema
 
+    def _trace_model_specs(self, model):
+        """Find the input and output specs of a model by tracing it in memory
+
+        This matches the names of the serving signature Keras generates when
+        saving the model, without writing the model to disk and reloading it.
+
+        Returns
+        -------
+        Tuple[dict, dict]
+            Input and output specs keyed by column name, or (None, None)
+            if the model can't be traced this way
+        """
+        input_spec = model._saved_model_inputs_spec
+        output_names = getattr(model, "output_names", None)
+        if input_spec is None or not output_names:
+            return None, None
+
+        flat_inputs = tf.nest.flatten(input_spec)
+        input_names = [spec.name for spec in flat_inputs]
+        if None in input_names or len(set(input_names)) != len(input_names):
+            return None, None
+
+        try:
+            concrete = tf.function(
+                lambda inputs: model(inputs, training=False)
+            ).get_concrete_function(input_spec)
+        except Exception:  # pylint: disable=broad-except
+            return None, None
+
+        # Keras names the outputs of the serving signature after the output
+        # layers, even when the model returns a dict keyed by something else
+        flat_outputs = tf.nest.flatten(concrete.structured_outputs)
+        if len(flat_outputs) != len(output_names):
+            return None, None
+        output_specs = dict(zip(output_names, flat_outputs))
+
+        return dict(zip(input_names, flat_inputs)), output_specs
+
+    def _name_outputs(self, model, outputs):
+        """Key model outputs by the names the Keras serving signature gives them
+
+        Keras names the flattened outputs after `model.output_names`. Subclassed
+        and revived models may not have output names, so fall back to the keys of
+        dict outputs, or the only output column for a single output.
+
+        Returns
+        -------
+        dict
+            Outputs keyed by name, empty if they can't be named
+        """
+        flat_outputs = tf.nest.flatten(outputs)
+        output_names = getattr(model, "output_names", None)
+        if output_names and len(output_names) == len(flat_outputs):
+            return dict(zip(output_names, flat_outputs))
+        if isinstance(outputs, dict):
+            return dict(outputs)
+        column_names = self.output_schema.column_names
+        if len(flat_outputs) == 1 and len(column_names) == 1:
+            return {column_names[0]: flat_outputs[0]}
+        return {}
+
     def _ensure_input_spec_includes_names(self, model):
-        if isinstance(model._saved_model_inputs_spec, dict):
-            for key, spec in model._saved_model_inputs_spec.items():
-                if isinstance(spec, tuple):
-                    model._saved_model_inputs_spec[key] = (
+        input_spec = model._saved_model_inputs_spec
+        if not isinstance(input_spec, dict):
+            return model
+
+        for key, spec in list(input_spec.items()):
+            if isinstance(spec, tuple):
+                if spec[0].name != key or spec[1].name != key:
+                    input_spec[key] = (
                         tf.TensorSpec(shape=spec[0].shape, dtype=spec[0].dtype, name=key),
                         tf.TensorSpec(shape=spec[1].shape, dtype=spec[1].dtype, name=key),
                     )
-                else:
-                    model._saved_model_inputs_spec[key] = tf.TensorSpec(
-                        shape=spec.shape, dtype=spec.dtype, name=key
-                    )
+            elif spec.name != key:
+                input_spec[key] = tf.TensorSpec(shape=spec.shape, dtype=spec.dtype, name=key)
 
         return model
 
@@ -180,3 +364,56 @@ class PredictTensorflow(InferenceOperator):
         return col_schema.with_dtype(
             col_schema.dtype, is_list=True, is_ragged=False
         ).with_properties({"value_count": {"min": list_length, "max": list_length}})
+
+
+def _schema_cache_path(path):
+    """Location of the cached schemas for the SavedModel at `path`, if it is one
+
+    The cache is keyed by a hash of `saved_model.pb`, which holds the model's
+    signatures, so any change to the model's inputs or outputs misses the cache.
+    The library versions are part of the key too, since they can change how the
+    schemas are built from the same model.
+    """
+    saved_model_pb = pathlib.Path(path) / "saved_model.pb"
+    if not saved_model_pb.is_file():
+        return None
+
+    digest = hashlib.blake2b(saved_model_pb.read_bytes())
+    for version in (merlin_core_version, merlin_systems_version, tf.__version__):
+        digest.update(str(version).encode())
+    cache_home = os.environ.get("XDG_CACHE_HOME", pathlib.Path.home() / ".cache")
+    return pathlib.Path(cache_home) / "merlin" / "schemas" / f"{digest.hexdigest()}.json"
+
+
+def _load_cached_schemas(path):
+    try:
+        cache_path = _schema_cache_path(path)
+        if cache_path is None or not cache_path.is_file():
+            return None
+        with open(cache_path, "r", encoding="utf-8") as f:
+            cached = json.load(f)
+        return tuple(
+            TensorflowMetadata.from_json(cached[key]).to_merlin_schema()
+            for key in ("input_schema", "output_schema")
+        )
+    except Exception:  # pylint: disable=broad-except
+        # A missing, stale or unreadable cache entry just means rebuilding the schemas
+        return None
+
+
+def _save_cached_schemas(path, schemas):
+    try:
+        cache_path = _schema_cache_path(path)
+        if cache_path is None:
+            return
+        input_schema, output_schema = schemas
+        cached = {
+            "input_schema": TensorflowMetadata.from_merlin_schema(input_schema).to_json(),
+            "output_schema": TensorflowMetadata.from_merlin_schema(output_schema).to_json(),
+        }
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(cache_path, "w", encoding="utf-8") as f:
+            json.dump(cached, f)
+    except Exception:  # pylint: disable=broad-except
+        # Failing to cache the schemas only means rebuilding them next time
+        pass
@@ -15,10 +15,11 @@
 #
 import os
 import pathlib
-from shutil import copytree
+from functools import partial
+from shutil import copy2, copytree, rmtree
 
 # this needs to be before any modules that import protobuf
-os.environ["PROTOCOL_BUFFERS_PYTHON_IMPLEMENTATION"] = "python"
+os.environ.setdefault("PROTOCOL_BUFFERS_PYTHON_IMPLEMENTATION", "python")
 
 import tritonclient.grpc.model_config_pb2 as model_config  # noqa
 from google.protobuf import text_format  # noqa
@@ -44,19 +45,53 @@ class PredictTensorflowTriton(TritonOperator):
         self.input_schema = op.input_schema
         self.output_schema = op.output_schema
         self.path = op.path
-        self.model = op.model
 
+        self.max_batch_size = op.max_batch_size
+        self.preferred_batch_sizes = op.preferred_batch_sizes
+        self.max_queue_delay_us = op.max_queue_delay_us
+        self.instance_count = op.instance_count
+        self.instance_kind = op.instance_kind
+        self.jit_compile = op.jit_compile
+        self.pinned_memory = op.pinned_memory
+        self.link_model_files = op.link_model_files
+
+        self._cache_schema_info()
         self._tf_model_name = None
 
-    def __getstate__(self) -> dict:
-        """Return state of instance when pickled.
+    @property
+    def model(self):
+        """The TensorFlow model held by the wrapped operator"""
+        return self.op.model
 
-        Returns
-        -------
-        dict
-            Returns object state excluding model attribute.
+    def __setstate__(self, state: dict):
+        """Restore state of instance when unpickled.
+
+        Parameters
+        ----------
+        state : dict
+            Pickled object state
         """
-        return {k: v for k, v in self.__dict__.items() if k != "model"}
+        self.__dict__.update(state)
+        self._cache_schema_info()
+
+    def _cache_schema_info(self):
+        # The schemas are fixed once the operator is built, so work out how each
+        # column is sent to the model and declared in its config only once
+        self._output_names = tuple(self.output_schema.column_names)
+        self._input_names = tuple(self.input_schema.column_names)
+        # Triton takes the requested outputs as a list, so build it once and
+        # pass the same list to every request
+        self._requested_output_names = list(self._output_names)
+
+        batch_dim = self.max_batch_size <= 0
+        self._input_dims = {
+            name: compute_dims(col_schema, self.scalar_shape, batch_dim=batch_dim)
+            for name, col_schema in self.input_schema.column_schemas.items()
+        }
+        self._output_dims = {
+            name: compute_dims(col_schema, self.scalar_shape, batch_dim=batch_dim)
+            for name, col_schema in self.output_schema.column_schemas.items()
+        }
 
     def transform(self, col_selector: ColumnSelector, transformable: Transformable):
         """Run transform of operator callling TensorFlow model with a Triton InferenceRequest.
@@ -67,18 +102,14 @@ class PredictTensorflowTriton(TritonOperator):
             TensorFlow Model Outputs
         """
         # TODO: Validate that the inputs match the schema
-        # TODO: Should we coerce the dtypes to match the schema here?
         inference_request = dict_array_to_triton_request(
-            self.tf_model_name,
-            transformable,
-            self.input_schema.column_names,
-            self.output_schema.column_names,
+            self.tf_model_name, transformable, self._input_names, self._requested_output_names
         )
         inference_response = inference_request.exec()
 
         # TODO: Validate that the outputs match the schema
         return triton_response_to_dict_array(
-            inference_response, type(transformable), self.output_schema.column_names
+            inference_response, type(transformable), self._output_names
         )
 
     def export(
@@ -92,6 +123,10 @@ class PredictTensorflowTriton(TritonOperator):
         backend: str = "ensemble",
     ):
         """Create a directory inside supplied path based on our export name"""
+        # The batch size may have changed since the dims were computed, and the
+        # config must declare them for the batch size it's exported with
+        self._cache_schema_info()
+
         # Export Triton TF back-end directory and config etc
         export_name = self.__class__.__name__.lower()
         node_name = f"{node_id}_{export_name}" if node_id is not None else export_name
@@ -101,19 +136,62 @@ class PredictTensorflowTriton(TritonOperator):
 
         tf_model_path = pathlib.Path(node_export_path) / str(version) / "model.savedmodel"
 
-        if self.path:
+        if self.path and not self.jit_compile:
             copytree(
                 str(self.path),
                 tf_model_path,
                 dirs_exist_ok=True,
+                copy_function=partial(_copy_if_changed, link=self.link_model_files),
             )
         else:
-            self.model.save(tf_model_path, include_optimizer=False)
+            # Files from an earlier export may be hard links to another model,
+            # so remove them rather than letting the save write through them
+            if tf_model_path.exists():
+                rmtree(tf_model_path)
+            if self.jit_compile:
+                self.model.save(
+                    tf_model_path,
+                    include_optimizer=False,
+                    signatures={"serving_default": self._jit_compiled_signature()},
+                )
+            else:
+                self.model.save(tf_model_path, include_optimizer=False)
 
         self.set_tf_model_name(node_name)
         backend_model_config = self._export_model_config(node_name, node_export_path)
         return backend_model_config
 
+    def _jit_compiled_signature(self):
+        """Trace the model's serving function with XLA compilation enabled
+
+        Returns
+        -------
+        tf.types.experimental.ConcreteFunction
+            Serving function with outputs keyed by the model's output names
+        """
+        import tensorflow as tf
+
+        model = self.op._ensure_input_spec_includes_names(self.model)
+        if model._saved_model_inputs_spec is None:
+            raise ValueError(
+                "Can't compile the serving signature with XLA because the model's "
+                "input spec is unknown. Call the model on some inputs before exporting."
+            )
+
+        @tf.function(jit_compile=True)
+        def serve(inputs):
+            # Match the signature Keras generates, which names the flattened
+            # outputs after the output layers even when the model returns a dict
+            outputs = self.op._name_outputs(model, model(inputs, training=False))
+            if not outputs:
+                raise ValueError(
+                    "Can't compile the serving signature with XLA because the model's "
+                    "outputs can't be named. Set the model's output names before exporting."
+                )
+            return outputs
+
+        return serve.get_concrete_function(model._saved_model_inputs_spec)
+
     def _export_model_config(self, name, output_path):
         """Exports a TensorFlow model for serving with Triton
 
@@ -133,24 +211,47 @@ class PredictTensorflowTriton(TritonOperator):
         config.parameters["TF_GRAPH_TAG"].string_value = "serve"
         config.parameters["TF_SIGNATURE_DEF"].string_value = "serving_default"
 
-        for _, col_schema in self.input_schema.column_schemas.items():
+        if self.max_batch_size > 0:
+            config.max_batch_size = self.max_batch_size
+            preferred_batch_sizes = self.preferred_batch_sizes or [
+                size for size in (self.max_batch_size // 2, self.max_batch_size) if size > 0
+            ]
+            config.dynamic_batching.preferred_batch_size.extend(preferred_batch_sizes)
+            config.dynamic_batching.max_queue_delay_microseconds = self.max_queue_delay_us
+
+        instance_kinds = {
+            "auto": model_config.ModelInstanceGroup.Kind.KIND_AUTO,
+            "cpu": model_config.ModelInstanceGroup.Kind.KIND_CPU,
+            "gpu": model_config.ModelInstanceGroup.Kind.KIND_GPU,
+        }
+        instance_kind = self.instance_kind.lower()
+        if instance_kind not in instance_kinds:
+            raise ValueError(f"instance_kind must be one of {set(instance_kinds)}")
+
+        instance_group = config.instance_group.add()
+        instance_group.count = self.instance_count
+        instance_group.kind = instance_kinds[instance_kind]
+
+        config.optimization.input_pinned_memory.enable = self.pinned_memory
+        config.optimization.output_pinned_memory.enable = self.pinned_memory
+
+        for name, col_schema in self.input_schema.column_schemas.items():
             add_model_param(
-                config.input,
-                model_config.ModelInput,
-                col_schema,
-                compute_dims(col_schema, self.scalar_shape),
+                config.input, model_config.ModelInput, col_schema, self._input_dims[name]
             )
 
-        for _, col_schema in self.output_schema.column_schemas.items():
+        for name, col_schema in self.output_schema.column_schemas.items():
             add_model_param(
-                config.output,
-                model_config.ModelOutput,
-                col_schema,
-                compute_dims(col_schema, self.scalar_shape),
+                config.output, model_config.ModelOutput, col_schema, self._output_dims[name]
             )
 
-        with open(os.path.join(output_path, "config.pbtxt"), "w", encoding="utf-8") as o:
-            text_format.PrintMessage(config, o)
+        # Leave an unchanged config alone, so re-exporting doesn't touch the file
+        # and trigger a reload in Triton's model repository polling
+        config_text = text_format.MessageToString(config, use_short_repeateds=True)
+        config_path = os.path.join(output_path, "config.pbtxt")
+        if not os.path.exists(config_path) or _read_text(config_path) != config_text:
+            with open(config_path, "w", encoding="utf-8") as o:
+                o.write(config_text)
         return config
 
     @property
@@ -167,3 +268,36 @@ class PredictTensorflowTriton(TritonOperator):
             Triton model directory name
         """
         self._tf_model_name = tf_model_name
+
+
+def _read_text(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def _copy_if_changed(src, dst, link=False):
+    """Copy a file unless the destination already has the same size and mtime
+
+    Files are copied with `copy2`, which copies in the kernel where possible
+    and preserves modification times, so files copied by an earlier export
+    are skipped when the source model hasn't changed since. With `link`, files
+    are hard linked instead when the source and destination are on the same
+    filesystem, falling back to a copy when they can't be linked.
+    """
+    src_stat = os.stat(src)
+    try:
+        dst_stat = os.stat(dst)
+        if src_stat.st_size == dst_stat.st_size and src_stat.st_mtime_ns == dst_stat.st_mtime_ns:
+            return dst
+        os.remove(dst)
+    except FileNotFoundError:
+        pass
+
+    if link and src_stat.st_dev == os.stat(os.path.dirname(dst)).st_dev:
+        try:
+            os.link(src, dst)
+            return dst
+        except OSError:
+            # Some filesystems don't support hard links
+            pass
+    return copy2(src, dst)
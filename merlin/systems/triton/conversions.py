@@ -110,7 +110,8 @@ def dict_array_to_triton_request(model_name, dictarray, input_col_names, output_
     dictarray : DictArray
         Dictionary-like representation of the output columns
     input_col_names : List[str]
-        List of the input columns to create triton request
+        List of the input columns to create triton request. Columns missing
+        from the DictArray are skipped.
     output_col_names : List[str]
         List of the output columns to extract from the response
 
@@ -121,10 +122,11 @@ def dict_array_to_triton_request(model_name, dictarray, input_col_names, output_
     """
     input_tensors = []
 
-    for name, column in dictarray.items():
-        if name in input_col_names:
-            col_tensor = _triton_tensor_from_array(name, column.values)
-            input_tensors.append(col_tensor)
+    for name in input_col_names:
+        if name not in dictarray:
+            continue
+        col_tensor = _triton_tensor_from_array(name, dictarray[name].values)
+        input_tensors.append(col_tensor)
 
     return pb_utils.InferenceRequest(
         model_name=model_name,
@@ -152,11 +154,13 @@ def triton_response_to_dict_array(response, transformable_type, output_column_na
     Transformable
         A DictArray or DataFrame representing the response columns from a Triton request
     """
-    outputs_dict = {}
+    response_tensors = {tensor.name(): tensor for tensor in response.output_tensors()}
 
-    for out_col_name in output_column_names:
-        output_val = _array_from_triton_tensor(response, out_col_name)
-        outputs_dict[out_col_name] = output_val
+    outputs_dict = {}
+    for name in output_column_names:
+        if name not in response_tensors:
+            raise ValueError(f"Column {name} not found in {type(response)}")
+        outputs_dict[name] = _to_array_lib(response_tensors[name])
 
     return transformable_type(outputs_dict)
 
@@ -165,6 +169,7 @@ def _triton_tensor_from_array(name, array):
     # The .get() here handles variations across Numpy versions, some of which
     # require .get() to be used here and some of which don't.
     array = array.get() if hasattr(array, "get") else array
+    array = _as_contiguous(array)
     if not isinstance(array, np.ndarray):
         # TODO: Find a way to keep GPU arrays on the GPU instead of forcing a move to CPU here
         # This move is a workaround for CuPy and Triton dlpack implementations not working together
@@ -174,6 +179,18 @@ def _triton_tensor_from_array(name, array):
     return tensor
 
 
+def _as_contiguous(values):
+    """Return values as a C-contiguous array, copying only when the layout differs
+
+    Triton copies arrays that don't match the tensor layout it expects, so do
+    the copy once up front. The dtype is left alone: casting here could
+    silently wrap or truncate values that don't fit the model's input type.
+    """
+    if not isinstance(values, np.ndarray) or values.flags.c_contiguous:
+        return values
+    return np.ascontiguousarray(values)
+
+
 def _array_from_triton_tensor(triton_obj, name):
     if isinstance(triton_obj, pb_utils.InferenceRequest):
         tensor = pb_utils.get_input_tensor_by_name(triton_obj, name)
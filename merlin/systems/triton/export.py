@@ -14,8 +14,11 @@
 #
 import os
 
-# this needs to be before any modules that import protobuf
-os.environ["PROTOCOL_BUFFERS_PYTHON_IMPLEMENTATION"] = "python"
+# this needs to be before any modules that import protobuf. The pure-python
+# implementation is only a default to work around protobuf versions that conflict
+# between tensorflow and tritonclient. When the installed versions agree, set
+# PROTOCOL_BUFFERS_PYTHON_IMPLEMENTATION to "upb" (or "cpp") to use native code.
+os.environ.setdefault("PROTOCOL_BUFFERS_PYTHON_IMPLEMENTATION", "python")
 
 import tritonclient.grpc.model_config_pb2 as model_config  # noqa
 
@@ -86,6 +86,14 @@ mynames = [
 ]
 
 
+@pytest.fixture(autouse=True)
+def cache_home(tmp_path, monkeypatch):
+    # Keep anything cached by the code under test out of the real user cache
+    cache_dir = tmp_path / "cache"
+    monkeypatch.setenv("XDG_CACHE_HOME", str(cache_dir))
+    return cache_dir
+
+
 @pytest.fixture(scope="function")
 def df(engine, paths):
     _lib = cudf if cudf else pd
@@ -45,6 +45,11 @@ def test_compute_dims(column_schema, expected_dims):
     assert compute_dims(column_schema) == expected_dims
 
 
+def test_compute_dims_without_batch_dim():
+    assert compute_dims(ColumnSchema("col"), batch_dim=False) == [1]
+    assert compute_dims(ColumnSchema("col", dims=(None, 3, 4)), batch_dim=False) == [3, 4]
+
+
 @pytest.mark.skipif(not TRITON_SERVER_PATH, reason="triton server not found")
 def test_softmax_sampling(tmpdir):
     request_schema = Schema(
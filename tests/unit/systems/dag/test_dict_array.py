@@ -76,3 +76,9 @@ def test_multiple_arrays_to_dict():
 
     assert np.array_equal(dict_array["ids"].values, ids.astype(np.int64))
     assert np.array_equal(dict_array["scores"].values, scores.astype(np.float64))
+
+
+def test_dict_array_contains():
+    dict_array = DictArray({"col": np.array([1, 2, 3])})
+    assert "col" in dict_array
+    assert "other" not in dict_array
@@ -14,6 +14,8 @@
 # limitations under the License.
 #
 
+import errno
+import json
 import os
 import pathlib
 from copy import deepcopy
@@ -23,6 +25,7 @@ import pytest
 
 from merlin.dag import ColumnSelector, Graph
 from merlin.schema import ColumnSchema, Schema
+from merlin.systems.dag import DictArray
 
 # this needs to be before any modules that import protobuf
 os.environ["PROTOCOL_BUFFERS_PYTHON_IMPLEMENTATION"] = "python"
@@ -79,6 +82,261 @@ def test_tf_op_exports_own_config(tmpdir):
         assert parsed.backend == "tensorflow"
 
 
+def test_tf_op_exports_dynamic_batching_config(tmpdir):
+    model = tf.keras.models.Sequential(
+        [
+            tf.keras.Input(name="input", dtype=tf.int32, shape=(784,)),
+            tf.keras.layers.Dense(512, activation="relu"),
+            tf.keras.layers.Dropout(0.2),
+            tf.keras.layers.Dense(10, name="output"),
+        ]
+    )
+
+    model.compile(
+        optimizer="adam",
+        loss=tf.losses.SparseCategoricalCrossentropy(from_logits=True),
+        metrics=[tf.metrics.SparseCategoricalAccuracy()],
+    )
+
+    input_schema = Schema([ColumnSchema("input", dtype=np.int32)])
+    output_schema = Schema([ColumnSchema("output", dtype=np.float32)])
+
+    tf_model_op = tf_op.PredictTensorflow(model, max_batch_size=64, max_queue_delay_us=50)
+    triton_op = tf_triton_op.PredictTensorflowTriton(tf_model_op)
+    triton_op.export(tmpdir, input_schema, output_schema)
+
+    config_path = pathlib.Path(tmpdir) / triton_op.export_name / "config.pbtxt"
+    with open(config_path, "rb") as f:
+        parsed = text_format.Parse(f.read(), model_config.ModelConfig())
+
+    assert parsed.max_batch_size == 64
+    assert list(parsed.dynamic_batching.preferred_batch_size) == [32, 64]
+    assert parsed.dynamic_batching.max_queue_delay_microseconds == 50
+    # Triton adds the batch dimension implicitly when batching is enabled
+    assert list(parsed.input[0].dims) == [784]
+    assert list(parsed.output[0].dims) == [10]
+
+
+@pytest.mark.parametrize(
+    ["instance_kind", "expected_kind"],
+    [
+        ["AUTO", model_config.ModelInstanceGroup.Kind.KIND_AUTO],
+        ["GPU", model_config.ModelInstanceGroup.Kind.KIND_GPU],
+        ["cpu", model_config.ModelInstanceGroup.Kind.KIND_CPU],
+    ],
+)
+def test_tf_op_exports_instance_group(tmpdir, instance_kind, expected_kind):
+    model = tf.keras.models.Sequential(
+        [
+            tf.keras.Input(name="input", dtype=tf.int32, shape=(784,)),
+            tf.keras.layers.Dense(10, name="output"),
+        ]
+    )
+
+    input_schema = Schema([ColumnSchema("input", dtype=np.int32)])
+    output_schema = Schema([ColumnSchema("output", dtype=np.float32)])
+
+    tf_model_op = tf_op.PredictTensorflow(model, instance_count=3, instance_kind=instance_kind)
+    triton_op = tf_triton_op.PredictTensorflowTriton(tf_model_op)
+    config = triton_op.export(tmpdir, input_schema, output_schema)
+
+    assert len(config.instance_group) == 1
+    assert config.instance_group[0].count == 3
+    assert config.instance_group[0].kind == expected_kind
+
+
+@pytest.mark.parametrize("pinned_memory", [True, False])
+def test_tf_op_exports_pinned_memory(tmpdir, pinned_memory):
+    model = tf.keras.models.Sequential(
+        [
+            tf.keras.Input(name="input", dtype=tf.int32, shape=(784,)),
+            tf.keras.layers.Dense(10, name="output"),
+        ]
+    )
+
+    input_schema = Schema([ColumnSchema("input", dtype=np.int32)])
+    output_schema = Schema([ColumnSchema("output", dtype=np.float32)])
+
+    tf_model_op = tf_op.PredictTensorflow(model, pinned_memory=pinned_memory)
+    triton_op = tf_triton_op.PredictTensorflowTriton(tf_model_op)
+    config = triton_op.export(tmpdir, input_schema, output_schema)
+
+    assert config.optimization.input_pinned_memory.enable == pinned_memory
+    assert config.optimization.output_pinned_memory.enable == pinned_memory
+
+
+def test_tf_op_exports_jit_compiled_model(tmpdir):
+    model = tf.keras.models.Sequential(
+        [
+            tf.keras.Input(name="input", dtype=tf.float32, shape=(784,)),
+            tf.keras.layers.Dense(10, name="output"),
+        ]
+    )
+
+    input_schema = Schema([ColumnSchema("input", dtype=np.float32)])
+    output_schema = Schema([ColumnSchema("output", dtype=np.float32)])
+
+    tf_model_op = tf_op.PredictTensorflow(model, jit_compile=True)
+    triton_op = tf_triton_op.PredictTensorflowTriton(tf_model_op)
+    triton_op.export(tmpdir, input_schema, output_schema)
+
+    tf_model_path = pathlib.Path(tmpdir) / triton_op.export_name / "1" / "model.savedmodel"
+    reloaded = tf.keras.models.load_model(tf_model_path)
+    signature = reloaded.signatures["serving_default"]
+
+    assert list(signature.structured_input_signature[1].keys()) == ["input"]
+    assert list(signature.structured_outputs.keys()) == ["output"]
+
+    inputs = tf.random.uniform((2, 784))
+    np.testing.assert_allclose(
+        signature(input=inputs)["output"].numpy(), model(inputs).numpy(), rtol=1e-5
+    )
+
+
+def test_tf_op_reexport_skips_unchanged_files(tmpdir):
+    model = tf.keras.models.Sequential(
+        [
+            tf.keras.Input(name="input", dtype=tf.int32, shape=(784,)),
+            tf.keras.layers.Dense(10, name="output"),
+        ]
+    )
+    model_path = pathlib.Path(tmpdir) / "model.savedmodel"
+    model.save(model_path, include_optimizer=False)
+
+    input_schema = Schema([ColumnSchema("input", dtype=np.int32)])
+    output_schema = Schema([ColumnSchema("output", dtype=np.float32)])
+
+    export_dir = pathlib.Path(tmpdir) / "export"
+    export_dir.mkdir()
+    triton_op = tf_triton_op.PredictTensorflowTriton(tf_op.PredictTensorflow(str(model_path)))
+    triton_op.export(export_dir, input_schema, output_schema)
+
+    export_path = export_dir / triton_op.export_name
+    exported_files = [export_path / "config.pbtxt"] + [
+        path for path in (export_path / "1" / "model.savedmodel").rglob("*") if path.is_file()
+    ]
+    mtimes = {path: path.stat().st_mtime_ns for path in exported_files}
+
+    triton_op.export(export_dir, input_schema, output_schema)
+
+    assert {path: path.stat().st_mtime_ns for path in exported_files} == mtimes
+
+
+@pytest.mark.parametrize("link_model_files", [True, False])
+def test_tf_op_export_links_model_files_only_when_requested(tmpdir, link_model_files):
+    model = tf.keras.models.Sequential(
+        [
+            tf.keras.Input(name="input", dtype=tf.int32, shape=(784,)),
+            tf.keras.layers.Dense(10, name="output"),
+        ]
+    )
+    model_path = pathlib.Path(tmpdir) / "model.savedmodel"
+    model.save(model_path, include_optimizer=False)
+
+    input_schema = Schema([ColumnSchema("input", dtype=np.int32)])
+    output_schema = Schema([ColumnSchema("output", dtype=np.float32)])
+
+    export_dir = pathlib.Path(tmpdir) / "export"
+    export_dir.mkdir()
+    tf_model_op = tf_op.PredictTensorflow(str(model_path), link_model_files=link_model_files)
+    triton_op = tf_triton_op.PredictTensorflowTriton(tf_model_op)
+    triton_op.export(export_dir, input_schema, output_schema)
+
+    exported_pb = export_dir / triton_op.export_name / "1" / "model.savedmodel" / "saved_model.pb"
+    assert exported_pb.read_bytes() == (model_path / "saved_model.pb").read_bytes()
+    assert os.path.samefile(exported_pb, model_path / "saved_model.pb") == link_model_files
+
+
+def test_tf_op_export_saves_over_linked_files_without_changing_them(tmpdir):
+    model = tf.keras.models.Sequential(
+        [
+            tf.keras.Input(name="input", dtype=tf.int32, shape=(784,)),
+            tf.keras.layers.Dense(10, name="output"),
+        ]
+    )
+    model_path = pathlib.Path(tmpdir) / "model.savedmodel"
+    model.save(model_path, include_optimizer=False)
+    saved_pb = (model_path / "saved_model.pb").read_bytes()
+
+    input_schema = Schema([ColumnSchema("input", dtype=np.int32)])
+    output_schema = Schema([ColumnSchema("output", dtype=np.float32)])
+
+    export_dir = pathlib.Path(tmpdir) / "export"
+    export_dir.mkdir()
+    linked_op = tf_op.PredictTensorflow(str(model_path), link_model_files=True)
+    tf_triton_op.PredictTensorflowTriton(linked_op).export(export_dir, input_schema, output_schema)
+
+    other_model = tf.keras.models.Sequential(
+        [
+            tf.keras.Input(name="input", dtype=tf.int32, shape=(784,)),
+            tf.keras.layers.Dense(10, activation="relu", name="output"),
+        ]
+    )
+    saved_op = tf_op.PredictTensorflow(other_model)
+    tf_triton_op.PredictTensorflowTriton(saved_op).export(export_dir, input_schema, output_schema)
+
+    assert (model_path / "saved_model.pb").read_bytes() == saved_pb
+
+
+def test_tf_op_export_copies_files_that_cant_be_linked(tmpdir, monkeypatch):
+    src = pathlib.Path(tmpdir) / "src.txt"
+    src.write_text("model")
+    dst = pathlib.Path(tmpdir) / "dst.txt"
+
+    def cross_device_link(src, dst):
+        raise OSError(errno.EXDEV, "Invalid cross-device link")
+
+    monkeypatch.setattr(os, "link", cross_device_link)
+    tf_triton_op._copy_if_changed(str(src), str(dst), link=True)
+
+    assert dst.read_text() == "model"
+    assert not os.path.samefile(src, dst)
+    assert dst.stat().st_mtime_ns == src.stat().st_mtime_ns
+
+
+def test_tf_op_caches_schemas_for_saved_models(tmpdir, cache_home):
+    model = tf.keras.models.Sequential(
+        [
+            tf.keras.Input(name="input", dtype=tf.int32, shape=(784,)),
+            tf.keras.layers.Dense(10, name="output"),
+        ]
+    )
+    model_path = str(tmpdir / "model.savedmodel")
+    model.save(model_path, include_optimizer=False)
+
+    first_op = tf_op.PredictTensorflow(model_path)
+    assert first_op._model is not None
+
+    second_op = tf_op.PredictTensorflow(model_path)
+    assert second_op._model is None
+    assert second_op.input_schema == first_op.input_schema
+    assert second_op.output_schema == first_op.output_schema
+
+    # The model is still loaded when it's needed
+    assert second_op.model is not None
+
+    cache_files = list((cache_home / "merlin" / "schemas").glob("*.json"))
+    assert len(cache_files) == 1
+    assert set(json.loads(cache_files[0].read_text())) == {"input_schema", "output_schema"}
+
+
+def test_tf_op_schema_cache_can_be_disabled(tmpdir, cache_home):
+    model = tf.keras.models.Sequential(
+        [
+            tf.keras.Input(name="input", dtype=tf.int32, shape=(784,)),
+            tf.keras.layers.Dense(10, name="output"),
+        ]
+    )
+    model_path = str(tmpdir / "model.savedmodel")
+    model.save(model_path, include_optimizer=False)
+
+    tf_op.PredictTensorflow(model_path, cache_schemas=False)
+    second_op = tf_op.PredictTensorflow(model_path, cache_schemas=False)
+
+    assert second_op._model is not None
+    assert not (cache_home / "merlin" / "schemas").exists()
+
+
 def test_tf_op_compute_schema():
     model = tf.keras.models.Sequential(
         [
@@ -170,3 +428,118 @@ def test_tf_op_infers_schema_for_input_tuples():
     assert op.output_schema == Schema(
         [ColumnSchema("dot", dtype=np.float32, is_list=False, is_ragged=False)]
     )
+
+
+def test_tf_op_transform_maps_outputs_by_name():
+    inputs = tf.keras.Input(name="input", dtype=tf.float32, shape=(4,))
+    first = tf.keras.layers.Dense(1, name="first")(inputs)
+    second = tf.keras.layers.Dense(2, name="second")(inputs)
+    model = tf.keras.Model(inputs=inputs, outputs=[first, second])
+
+    op = tf_op.PredictTensorflow(model)
+    values = np.ones((3, 4), dtype=np.float32)
+    outputs = op.transform(ColumnSelector(["input"]), DictArray({"input": values}))
+
+    expected_first, expected_second = model(values)
+    np.testing.assert_allclose(outputs["first"].values, expected_first.numpy())
+    np.testing.assert_allclose(outputs["second"].values, expected_second.numpy())
+
+
+def test_tf_op_transform_names_single_output_of_subclassed_model():
+    class Scale(tf.keras.Model):
+        def call(self, inputs):
+            return inputs["input"] * 2.0
+
+    model = Scale()
+    model({"input": tf.ones((1, 4))})
+
+    op = tf_op.PredictTensorflow(model)
+    (output_name,) = op.output_schema.column_names
+    values = np.ones((3, 4), dtype=np.float32)
+    outputs = op.transform(ColumnSelector(["input"]), DictArray({"input": values}))
+
+    np.testing.assert_allclose(outputs[output_name].values, values * 2.0)
+
+
+def test_tf_op_transform_raises_for_missing_output_columns():
+    model = tf.keras.models.Sequential(
+        [
+            tf.keras.Input(name="input", dtype=tf.float32, shape=(4,)),
+            tf.keras.layers.Dense(1, name="output"),
+        ]
+    )
+
+    op = tf_op.PredictTensorflow(model)
+    op.output_schema = Schema([ColumnSchema("output"), ColumnSchema("other")])
+    values = np.ones((3, 4), dtype=np.float32)
+
+    with pytest.raises(ValueError) as exception_info:
+        op.transform(ColumnSelector(["input"]), DictArray({"input": values}))
+    assert "['other']" in str(exception_info.value)
+
+
+def test_tf_op_traces_schemas_without_saving_model(monkeypatch):
+    model = tf.keras.models.Sequential(
+        [
+            tf.keras.Input(name="input", dtype=tf.int32, shape=(784,)),
+            tf.keras.layers.Dense(10, name="output"),
+        ]
+    )
+
+    def fail_save(*args, **kwargs):
+        raise AssertionError("the model should not be saved to build its schemas")
+
+    monkeypatch.setattr(tf.keras.Model, "save", fail_save)
+    op = tf_op.PredictTensorflow(model)
+
+    assert op.input_schema.column_names == ["input"]
+    assert op.output_schema.column_names == ["output"]
+
+
+def test_tf_op_traced_schemas_match_saved_signature(tmpdir):
+    inputs = tf.keras.Input(name="input", dtype=tf.float32, shape=(4,))
+    first = tf.keras.layers.Dense(1, name="first")(inputs)
+    second = tf.keras.layers.Dense(2, name="second")(inputs)
+    model = tf.keras.Model(inputs=inputs, outputs={"b": first, "a": second})
+
+    traced_op = tf_op.PredictTensorflow(model)
+
+    model_path = str(tmpdir / "model.savedmodel")
+    model.save(model_path, include_optimizer=False)
+    saved_op = tf_op.PredictTensorflow(model_path, cache_schemas=False)
+
+    assert traced_op.input_schema == saved_op.input_schema
+    assert traced_op.output_schema == saved_op.output_schema
+
+
+def test_tf_op_export_uses_current_max_batch_size_for_dims(tmpdir):
+    model = tf.keras.models.Sequential(
+        [
+            tf.keras.Input(name="input", dtype=tf.int32, shape=(784,)),
+            tf.keras.layers.Dense(10, name="output"),
+        ]
+    )
+
+    input_schema = Schema([ColumnSchema("input", dtype=np.int32)])
+    output_schema = Schema([ColumnSchema("output", dtype=np.float32)])
+
+    triton_op = tf_triton_op.PredictTensorflowTriton(tf_op.PredictTensorflow(model))
+    triton_op.max_batch_size = 64
+    config = triton_op.export(tmpdir, input_schema, output_schema)
+
+    assert config.max_batch_size == 64
+    assert all(-1 not in model_input.dims for model_input in config.input)
+    assert all(-1 not in model_output.dims for model_output in config.output)
+
+
+def test_tf_op_rejects_unknown_instance_kind():
+    model = tf.keras.models.Sequential(
+        [
+            tf.keras.Input(name="input", dtype=tf.int32, shape=(784,)),
+            tf.keras.layers.Dense(10, name="output"),
+        ]
+    )
+
+    with pytest.raises(ValueError) as exception_info:
+        tf_op.PredictTensorflow(model, instance_kind="TPU")
+    assert "instance_kind" in str(exception_info.value)
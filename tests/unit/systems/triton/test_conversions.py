@@ -0,0 +1,109 @@
+#
+# Copyright (c) 2022, NVIDIA CORPORATION.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from merlin.systems.dag import DictArray
+from merlin.systems.triton import conversions
+from merlin.systems.triton.conversions import (
+    _as_contiguous,
+    dict_array_to_triton_request,
+    triton_response_to_dict_array,
+)
+
+
+class FakeTensor:
+    def __init__(self, name, array):
+        self._name = name
+        self._array = array
+
+    def name(self):
+        return self._name
+
+    def is_cpu(self):
+        return True
+
+    def as_numpy(self):
+        return self._array
+
+
+class FakeInferenceRequest:
+    def __init__(self, model_name, requested_output_names, inputs):
+        self.model_name = model_name
+        self.requested_output_names = requested_output_names
+        self.inputs = inputs
+
+
+class FakeInferenceResponse:
+    def __init__(self, output_tensors):
+        self._output_tensors = output_tensors
+
+    def output_tensors(self):
+        return self._output_tensors
+
+
+@pytest.fixture
+def fake_pb_utils(monkeypatch):
+    # triton_python_backend_utils only exists inside Triton's Python backend
+    fake = SimpleNamespace(
+        Tensor=FakeTensor,
+        InferenceRequest=FakeInferenceRequest,
+        InferenceResponse=FakeInferenceResponse,
+    )
+    monkeypatch.setattr(conversions, "pb_utils", fake)
+    return fake
+
+
+def test_as_contiguous_fixes_layout_without_casting():
+    values = np.arange(12, dtype=np.int64).reshape(3, 4)
+    assert _as_contiguous(values) is values
+
+    transposed = _as_contiguous(values.T)
+    assert transposed.dtype == np.int64
+    assert transposed.flags.c_contiguous
+    np.testing.assert_array_equal(transposed, values.T)
+
+
+def test_dict_array_to_triton_request_skips_missing_columns(fake_pb_utils):
+    dictarray = DictArray({"a": np.array([1, 2]), "b": np.array([3, 4]), "c": np.array([5, 6])})
+
+    request = dict_array_to_triton_request("model", dictarray, ["b", "label", "a"], ["out"])
+
+    assert request.model_name == "model"
+    assert request.requested_output_names == ["out"]
+    assert [tensor.name() for tensor in request.inputs] == ["b", "a"]
+    np.testing.assert_array_equal(request.inputs[0].as_numpy(), np.array([3, 4]))
+
+
+def test_triton_response_to_dict_array_selects_output_columns(fake_pb_utils):
+    response = FakeInferenceResponse(
+        [FakeTensor("x", np.array([1.0, 2.0])), FakeTensor("y", np.array([3.0, 4.0]))]
+    )
+
+    outputs = triton_response_to_dict_array(response, DictArray, ["y"])
+
+    assert outputs.columns == ["y"]
+    np.testing.assert_array_equal(outputs["y"].values, np.array([3.0, 4.0]))
+
+
+def test_triton_response_to_dict_array_raises_for_missing_columns(fake_pb_utils):
+    response = FakeInferenceResponse([FakeTensor("x", np.array([1.0, 2.0]))])
+
+    with pytest.raises(ValueError) as exception_info:
+        triton_response_to_dict_array(response, DictArray, ["x", "y"])
+    assert "Column y not found" in str(exception_info.value)